@@ -7,7 +7,9 @@ from controller.video_upload_controller import (
     call_celery_audio,
     create_presigned_download_url, 
     initiate_video_upload, 
-    confirm_upload
+    confirm_upload,
+    get_editor_assets,
+    regenerate_editor_assets
 )
 from models.user import User
 from dependency import get_current_user
@@ -15,7 +17,8 @@ from sqlalchemy.orm import Session
 from schemas.video import (
     PresignedUploadResponse, 
     DownloadUrlResponse, 
-    VideoCompletionResponse
+    VideoCompletionResponse,
+    EditorAssetsResponse
 )
 
 router = APIRouter()
@@ -54,6 +57,26 @@ def upload_success(
     return confirm_upload(db=db, video_id=video_id, user=user)
 
 
+@router.get("/editor-assets", response_model=EditorAssetsResponse)
+def editor_assets(
+    video_id: int, 
+    user: Annotated[User, Depends(get_current_user)], 
+    db: Session = Depends(get_db)
+):
+    """Get presigned URLs for the proxy, thumbnail sprite and waveform of a video."""
+    return get_editor_assets(db=db, video_id=video_id, user=user)
+
+
+@router.post("/editor-assets", status_code=status.HTTP_202_ACCEPTED, response_model=EditorAssetsResponse)
+def create_editor_assets(
+    video_id: int, 
+    user: Annotated[User, Depends(get_current_user)], 
+    db: Session = Depends(get_db)
+):
+    """Queue (re)generation of the editor assets of a video."""
+    return regenerate_editor_assets(db=db, video_id=video_id, user=user)
+
+
 @router.get("/get_user_videos")
 def get_user_video(
     user: Annotated[User, Depends(get_current_user)], 
@@ -1,37 +1,26 @@
+from typing import Optional
+from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, status
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
-from tasks.video_tasks import extract_audio_and_transcribe
+from tasks.video_tasks import extract_audio_and_transcribe, queue_editor_assets
 from models.video import Video
 from models.user import User
-import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
-from botocore.config import Config
 import uuid
 import logging
 from core.config import settings
+from core.storage import EDITOR_ASSET_FILES, editor_asset_key, get_s3_client
+from core.url_cache import download_url_cache
 
 logger = logging.getLogger(__name__)
 
-R2_ACCOUNT_ID = settings.R2_ACCOUNT_ID
-R2_ACCESS_KEY = settings.R2_ACCESS_KEY
-R2_SECRET_KEY = settings.R2_SECRET_KEY
 R2_BUCKET_NAME = settings.R2_BUCKET_NAME
 PRESIGNED_URL_EXPIRATION = settings.PRESIGNED_URL_EXPIRATION
 
 # Allowed video file extensions
 ALLOWED_VIDEO_EXTENSIONS = {'mp4', 'mov', 'avi', 'webm', 'mkv', 'flv', 'wmv', 'm4v'}
 
-def get_s3_client():
-    """Create and return an S3 client for Cloudflare R2."""
-    return boto3.client(
-        service_name="s3",
-        endpoint_url=f'https://{R2_ACCOUNT_ID}.r2.cloudflarestorage.com',
-        aws_access_key_id=R2_ACCESS_KEY,
-        aws_secret_access_key=R2_SECRET_KEY,
-        region_name="auto",
-        config=Config(signature_version="s3v4")
-    )
-
 def call_celery_audio(user: User, s3_key: str) -> dict:
     """Trigger Celery task to extract audio and transcribe video.
     
@@ -90,11 +79,47 @@ def validate_video_extension(filename: str) -> str:
         )
     return ext
 
+def _cached_download_url(
+    s3_client,
+    user_id: int,
+    key: str,
+    cache_checked: bool = False,
+    cache_key: Optional[str] = None
+) -> str:
+    """Return a presigned GET URL for a key, reusing a cached one when possible.
+    
+    Callers must have checked that the object belongs to the user. Pass
+    `cache_checked=True` when the cache was already consulted for this key,
+    and `cache_key` to cache under a versioned name instead of the bare key.
+    """
+    cache_key = cache_key or key
+    if not cache_checked:
+        url = download_url_cache.get(user_id, cache_key)
+        if url:
+            return url
+    url = s3_client.generate_presigned_url(
+        'get_object',
+        Params={
+            'Bucket': R2_BUCKET_NAME,
+            'Key': key
+        },
+        ExpiresIn=PRESIGNED_URL_EXPIRATION
+    )
+    download_url_cache.set(user_id, cache_key, url)
+    return url
+
 def create_presigned_download_url(user: User, file_name: str, db: Session) -> dict:
     """Generate a presigned download URL for a video file.
     
     Validates that the file belongs to the authenticated user before generating URL.
+    A previously signed URL is reused while enough of its lifetime remains, which
+    skips both the ownership query and signing and lets clients cache the response.
     """
+    # Entries are only ever stored after the ownership check below passed
+    cached_url = download_url_cache.get(user.id, file_name)
+    if cached_url:
+        return {"download_url": cached_url}
+
     # Verify that the file belongs to the user
     video = db.query(Video).filter(
         Video.user_id == user.id,
@@ -109,14 +134,7 @@ def create_presigned_download_url(user: User, file_name: str, db: Session) -> di
     
     s3_client = get_s3_client()
     try:
-        get_url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={
-                'Bucket': R2_BUCKET_NAME, 
-                'Key': file_name
-            },
-            ExpiresIn=PRESIGNED_URL_EXPIRATION
-        )
+        get_url = _cached_download_url(s3_client, user.id, file_name, cache_checked=True)
         return {"download_url": get_url}
     except ClientError as e:
         error_code = getattr(e, "response", {}).get("Error", {}).get("Code", "Unknown")
@@ -205,7 +223,11 @@ def initiate_video_upload(user: User, file_name: str, db: Session, content_type:
 
 
 def confirm_upload(db: Session, video_id: int, user: User) -> dict:
-    """Confirm that a video upload is complete and verify the file exists in storage."""
+    """Confirm that a video upload is complete and verify the file exists in storage.
+    
+    The periodic bucket reconciliation may already have completed the upload, in
+    which case its status is trusted and storage is not queried again.
+    """
     video = db.query(Video).filter(Video.id == video_id, Video.user_id == user.id).first()
     if not video:
         raise HTTPException(
@@ -216,20 +238,143 @@ def confirm_upload(db: Session, video_id: int, user: User) -> dict:
     if video.status == "COMPLETED":
         return {"message": "Video already marked as completed", "video": video}
 
-    # Verify file exists in R2
+    # Verify file exists in R2. An EXPIRED upload is still accepted if its
+    # object turned up after the row was expired.
     s3_client = get_s3_client()
     try:
         s3_client.head_object(Bucket=R2_BUCKET_NAME, Key=video.s3_key)
     except ClientError as e:
         error_code = getattr(e, "response", {}).get("Error", {}).get("Code", "Unknown")
         logger.error(f"File verification failed for video {video_id}: {error_code}")
+        if video.status == "EXPIRED":
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Upload expired. Please upload the video again."
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File verification failed. Video not found in storage."
         )
 
-    video.status = "COMPLETED"
+    # Only move the row on if the reconciliation sweep has not done it meanwhile,
+    # so editor assets are queued exactly once
+    updated = db.query(Video).filter(
+        Video.id == video.id,
+        Video.status.in_(["PENDING", "EXPIRED"])
+    ).update(
+        {
+            Video.status: "COMPLETED",
+            Video.editor_assets_status: "PROCESSING",
+            Video.editor_assets_version: Video.editor_assets_version + 1,
+            Video.editor_assets_started_at: func.now()
+        },
+        synchronize_session=False
+    )
     db.commit()
     db.refresh(video)
+
+    if not updated:
+        return {"message": "Video already marked as completed", "video": video}
+
     logger.info(f"Upload confirmed for video {video_id}")
+    start_editor_assets(db, video)
     return {"message": "Upload verified and completed", "video": video}
+
+
+def start_editor_assets(db: Session, video: Video) -> None:
+    """Queue generation of the editor proxy, sprite and waveform for a video.
+    
+    The caller is expected to have marked the video PROCESSING and bumped its
+    `editor_assets_version` already. If the task cannot be queued the status
+    is set to FAILED so it can be retried.
+    """
+    if not queue_editor_assets(video.id, video.s3_key, video.editor_assets_version):
+        db.refresh(video)
+
+
+def get_editor_assets(db: Session, video_id: int, user: User) -> dict:
+    """Return presigned URLs for the editor assets of a video once they are ready.
+    
+    URLs come from the shared download URL cache, so an editing session that
+    reloads the assets reuses the same links. The cache key carries the asset
+    version, so regenerated assets never get links cached for an older run.
+    """
+    video = db.query(Video).filter(Video.id == video_id, Video.user_id == user.id).first()
+    if not video:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video not found"
+        )
+
+    response = {"video_id": video.id, "status": video.editor_assets_status}
+    if video.editor_assets_status != "READY":
+        return response
+
+    s3_client = get_s3_client()
+    try:
+        for asset in EDITOR_ASSET_FILES:
+            key = editor_asset_key(video.s3_key, asset)
+            response[f"{asset}_url"] = _cached_download_url(
+                s3_client, user.id, key,
+                cache_key=f"{key}?v={video.editor_assets_version}"
+            )
+    except ClientError as e:
+        error_code = getattr(e, "response", {}).get("Error", {}).get("Code", "Unknown")
+        logger.error(f"Failed to generate editor asset URLs for video {video_id}: {error_code}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not generate editor asset links"
+        )
+    return response
+
+
+def regenerate_editor_assets(db: Session, video_id: int, user: User) -> dict:
+    """Queue editor asset generation again after a failed or stuck run.
+    
+    Only videos without assets, with a FAILED run, or with a PROCESSING run
+    older than EDITOR_ASSETS_STALE_AFTER are requeued; anything else is a 409.
+    """
+    video = db.query(Video).filter(Video.id == video_id, Video.user_id == user.id).first()
+    if not video:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video not found"
+        )
+
+    if video.status != "COMPLETED":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Video upload has not been confirmed yet"
+        )
+
+    # Conditional so concurrent requests cannot both queue a run
+    stale_cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.EDITOR_ASSETS_STALE_AFTER)
+    updated = db.query(Video).filter(
+        Video.id == video.id,
+        or_(
+            Video.editor_assets_status.is_(None),
+            Video.editor_assets_status == "FAILED",
+            (Video.editor_assets_status == "PROCESSING") & (
+                Video.editor_assets_started_at.is_(None)
+                | (Video.editor_assets_started_at < stale_cutoff)
+            )
+        )
+    ).update(
+        {
+            Video.editor_assets_status: "PROCESSING",
+            Video.editor_assets_version: Video.editor_assets_version + 1,
+            Video.editor_assets_started_at: func.now()
+        },
+        synchronize_session=False
+    )
+    db.commit()
+    db.refresh(video)
+
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Editor assets are {video.editor_assets_status.lower()} and cannot be regenerated now"
+        )
+
+    start_editor_assets(db, video)
+    return {"video_id": video.id, "status": video.editor_assets_status}
@@ -8,7 +8,7 @@ celery_app = Celery(
     backend=redis_url
 )
 # Optional: Configure Celery to look for tasks in a specific module
-celery_app.conf.imports = ["tasks.video_tasks"]
+celery_app.conf.imports = ["tasks.video_tasks", "tasks.storage_tasks"]
 
 # Optional: Professional settings for reliability
 celery_app.conf.update(
@@ -16,4 +16,12 @@ celery_app.conf.update(
     task_serializer="json",
     result_serializer="json",
     accept_content=["json"],
-)
\ No newline at end of file
+)
+
+# Periodic jobs, run with `celery -A core.celery_app beat`
+celery_app.conf.beat_schedule = {
+    "reconcile-uploads": {
+        "task": "tasks.storage_tasks.reconcile_uploads",
+        "schedule": float(settings.UPLOAD_RECONCILE_INTERVAL),
+    },
+}
@@ -1,3 +1,4 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -16,8 +17,26 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str
     GEMINI_MODEL: str = "gemini-3-flash-preview"  # Default Gemini model
     PRESIGNED_URL_EXPIRATION: int = 3600  # 1 hour in seconds
+    PRESIGNED_URL_CACHE_SIZE: int = 10000  # Max download URLs kept in memory
+    PRESIGNED_URL_MIN_REMAINING_RATIO: float = 0.5  # Reuse a URL while more than this share of its lifetime is left
+    PRESIGNED_URL_CACHE_USE_REDIS: bool = False  # Share cached download URLs across workers through Redis
+
+    UPLOAD_RECONCILE_INTERVAL: int = 900  # Seconds between bucket reconciliation runs
+    UPLOAD_RECONCILE_BATCH_SIZE: int = 500  # Keys checked against the DB per query
+    PENDING_UPLOAD_TTL: int = 86400  # Seconds before an unconfirmed upload is expired
+    ORPHAN_OBJECT_GRACE: int = 86400  # Seconds before an object without a DB row counts as orphaned
+    ORPHAN_OBJECT_DELETE: bool = False  # Delete orphaned objects instead of only logging them
+    UPLOAD_RECONCILE_LOCK_TTL: int = 3600  # Seconds a reconciliation run holds its lock at most
+    EDITOR_ASSETS_STALE_AFTER: int = 3600  # Seconds before a PROCESSING editor assets run may be requeued
     
     class Config:
         env_file = ".env"
 
+    @model_validator(mode="after")
+    def check_pending_upload_ttl(self):
+        # An upload URL must have expired before its PENDING row may be expired
+        if self.PENDING_UPLOAD_TTL <= self.PRESIGNED_URL_EXPIRATION:
+            raise ValueError("PENDING_UPLOAD_TTL must be longer than PRESIGNED_URL_EXPIRATION")
+        return self
+
 settings = Settings()
@@ -0,0 +1,36 @@
+import boto3
+from botocore.config import Config
+from .config import settings
+
+
+def get_s3_client():
+    """Create and return an S3 client for Cloudflare R2."""
+    return boto3.client(
+        service_name="s3",
+        endpoint_url=f'https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com',
+        aws_access_key_id=settings.R2_ACCESS_KEY,
+        aws_secret_access_key=settings.R2_SECRET_KEY,
+        region_name="auto",
+        config=Config(signature_version="s3v4")
+    )
+
+
+# Derived files for the subtitle editor live next to the original upload,
+# e.g. `12/<uuid>.mp4` -> `12/<uuid>/editor/proxy.mp4`
+EDITOR_ASSET_DIR = "editor"
+EDITOR_ASSET_FILES = {
+    "proxy": "proxy.mp4",
+    "sprite": "sprite.jpg",
+    "sprite_index": "sprite.json",
+    "waveform": "waveform.json",
+}
+
+
+def editor_asset_prefix(s3_key: str) -> str:
+    """Return the key prefix holding the editor assets of an uploaded video."""
+    return f"{s3_key.rsplit('.', 1)[0]}/{EDITOR_ASSET_DIR}/"
+
+
+def editor_asset_key(s3_key: str, asset: str) -> str:
+    """Return the storage key of one editor asset of an uploaded video."""
+    return editor_asset_prefix(s3_key) + EDITOR_ASSET_FILES[asset]
@@ -0,0 +1,129 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import redis
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "presigned_url"
+
+
+class PresignedUrlCache:
+    """Cache of presigned download URLs keyed by (user_id, s3_key).
+
+    A cached URL is only returned while more than ``min_remaining_ratio`` of
+    its original lifetime is left, so clients always get a link that stays
+    valid long enough to be useful. Entries live in a bounded in-process LRU
+    and, when enabled, are also shared between workers through Redis.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        lifetime: int,
+        min_remaining_ratio: float,
+        redis_url: Optional[str] = None,
+    ):
+        if not 0 <= min_remaining_ratio < 1:
+            raise ValueError("PRESIGNED_URL_MIN_REMAINING_RATIO must be at least 0 and below 1")
+        self.max_size = max_size
+        self.lifetime = lifetime
+        self.min_remaining = lifetime * min_remaining_ratio
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = redis.Redis.from_url(redis_url) if redis_url else None
+
+    @staticmethod
+    def _redis_key(user_id: int, s3_key: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{user_id}:{s3_key}"
+
+    def _is_fresh(self, expires_at: float) -> bool:
+        return expires_at - time.time() > self.min_remaining
+
+    def _store_local(self, key: tuple, url: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (url, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, user_id: int, s3_key: str) -> Optional[str]:
+        """Return a cached URL that still has enough lifetime left, or None."""
+        key = (user_id, s3_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                url, expires_at = entry
+                if self._is_fresh(expires_at):
+                    self._entries.move_to_end(key)
+                    return url
+                del self._entries[key]
+
+        if self._redis is None:
+            return None
+
+        try:
+            raw = self._redis.get(self._redis_key(user_id, s3_key))
+        except redis.RedisError as e:
+            logger.warning(f"Presigned URL cache lookup failed: {e}")
+            return None
+        if raw is None:
+            return None
+
+        try:
+            entry = json.loads(raw)
+            url, expires_at = entry["url"], float(entry["expires_at"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed presigned URL cache entry: {e}")
+            return None
+        if not self._is_fresh(expires_at):
+            return None
+        self._store_local(key, url, expires_at)
+        return url
+
+    def set(self, user_id: int, s3_key: str, url: str) -> None:
+        """Remember a freshly signed URL valid for the configured lifetime."""
+        expires_at = time.time() + self.lifetime
+        self._store_local((user_id, s3_key), url, expires_at)
+
+        if self._redis is None:
+            return
+
+        # Let Redis drop the entry once it is no longer worth handing out
+        ttl = int(self.lifetime - self.min_remaining)
+        if ttl <= 0:
+            return
+        try:
+            self._redis.setex(
+                self._redis_key(user_id, s3_key),
+                ttl,
+                json.dumps({"url": url, "expires_at": expires_at}),
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Presigned URL cache store failed: {e}")
+
+    def invalidate(self, user_id: int, s3_key: str) -> None:
+        """Forget any cached URL for the given user and object."""
+        with self._lock:
+            self._entries.pop((user_id, s3_key), None)
+
+        if self._redis is None:
+            return
+        try:
+            self._redis.delete(self._redis_key(user_id, s3_key))
+        except redis.RedisError as e:
+            logger.warning(f"Presigned URL cache invalidation failed: {e}")
+
+
+download_url_cache = PresignedUrlCache(
+    max_size=settings.PRESIGNED_URL_CACHE_SIZE,
+    lifetime=settings.PRESIGNED_URL_EXPIRATION,
+    min_remaining_ratio=settings.PRESIGNED_URL_MIN_REMAINING_RATIO,
+    redis_url=settings.REDIS_URL if settings.PRESIGNED_URL_CACHE_USE_REDIS else None,
+)
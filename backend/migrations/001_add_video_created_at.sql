@@ -0,0 +1,7 @@
+-- Adds the upload timestamp and the index the reconciliation sweep uses
+-- to find stale PENDING uploads. Safe to run more than once (PostgreSQL).
+ALTER TABLE videos
+    ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now();
+
+CREATE INDEX IF NOT EXISTS ix_videos_status_created_at
+    ON videos (status, created_at);
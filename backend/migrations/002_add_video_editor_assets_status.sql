@@ -0,0 +1,4 @@
+-- Tracks generation of the subtitle editor proxy, sprite and waveform.
+-- Safe to run more than once (PostgreSQL).
+ALTER TABLE videos
+    ADD COLUMN IF NOT EXISTS editor_assets_status VARCHAR;
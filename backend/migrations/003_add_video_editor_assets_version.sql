@@ -0,0 +1,8 @@
+-- Tracks which editor assets run is current and when it started, so stuck
+-- runs can be requeued and late results of older runs are ignored.
+-- Safe to run more than once (PostgreSQL).
+ALTER TABLE videos
+    ADD COLUMN IF NOT EXISTS editor_assets_version INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE videos
+    ADD COLUMN IF NOT EXISTS editor_assets_started_at TIMESTAMP WITH TIME ZONE;
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, func
 from db.base import Base
 
 class Video(Base):
@@ -8,4 +8,14 @@ class Video(Base):
     s3_key = Column(String, unique=True, index=True)
     bucket = Column(String, nullable=False)
     original_name = Column(String, nullable=False)
-    status = Column(String, nullable=False)
\ No newline at end of file
+    status = Column(String, nullable=False)
+    editor_assets_status = Column(String, nullable=True)
+    # Bumped on every queued generation run, so late results of older runs are ignored
+    editor_assets_version = Column(Integer, nullable=False, default=0, server_default="0")
+    editor_assets_started_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Lets the upload sweeper find stale PENDING rows without a full scan
+    __table_args__ = (
+        Index("ix_videos_status_created_at", "status", "created_at"),
+    )
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 
 class VideoBase(BaseModel):
@@ -12,6 +13,7 @@ class VideoCreate(VideoBase):
 
 class VideoResponse(VideoBase):
     id: int
+    editor_assets_status: Optional[str] = None
     class Config:
         from_attributes = True
 
@@ -25,4 +27,12 @@ class DownloadUrlResponse(BaseModel):
 
 class VideoCompletionResponse(BaseModel):
     message: str
-    video: VideoResponse
\ No newline at end of file
+    video: VideoResponse
+
+class EditorAssetsResponse(BaseModel):
+    video_id: int
+    status: Optional[str] = None
+    proxy_url: Optional[str] = None
+    sprite_url: Optional[str] = None
+    sprite_index_url: Optional[str] = None
+    waveform_url: Optional[str] = None
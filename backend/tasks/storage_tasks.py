@@ -0,0 +1,234 @@
+import logging
+import redis
+from sqlalchemy import func, update
+from datetime import datetime, timedelta, timezone
+from core.celery_app import celery_app
+from core.config import settings
+from core.storage import EDITOR_ASSET_DIR, editor_asset_prefix, get_s3_client
+from core.url_cache import download_url_cache
+from db.session import SessionLocal
+from models.video import Video
+from tasks.video_tasks import queue_editor_assets
+
+logger = logging.getLogger(__name__)
+
+R2_BUCKET_NAME = settings.R2_BUCKET_NAME
+BATCH_SIZE = settings.UPLOAD_RECONCILE_BATCH_SIZE
+
+# DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+EDITOR_ASSET_MARKER = f"/{EDITOR_ASSET_DIR}/"
+
+RECONCILE_LOCK_KEY = "lock:reconcile_uploads"
+
+# Rows in these states are completed when their object turns up in the bucket.
+# EXPIRED is included for uploads that finished after their row was expired.
+UNSETTLED_STATUSES = ("PENDING", "EXPIRED")
+
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _editor_asset_owner_prefix(key: str):
+    """Return the editor asset prefix a key lives under, or None for uploads."""
+    idx = key.find(EDITOR_ASSET_MARKER)
+    if idx == -1:
+        return None
+    return key[:idx + len(EDITOR_ASSET_MARKER)]
+
+
+def list_user_prefixes(s3_client) -> list:
+    """Return the top-level `<user_id>/` prefixes present in the bucket."""
+    prefixes = []
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=R2_BUCKET_NAME, Delimiter="/"):
+        prefixes.extend(p["Prefix"] for p in page.get("CommonPrefixes", []))
+    return prefixes
+
+
+def list_prefix_objects(s3_client, prefix: str) -> dict:
+    """Return a mapping of object key to last-modified time under a prefix."""
+    objects = {}
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=R2_BUCKET_NAME, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            objects[obj["Key"]] = obj["LastModified"]
+    return objects
+
+
+def reconcile_prefix(db, s3_client, prefix: str, orphan_cutoff: datetime) -> dict:
+    """Sync one user prefix of the bucket with its `Video` rows.
+
+    PENDING or EXPIRED rows whose object exists are marked COMPLETED in bulk
+    and get their editor assets queued. Objects older than the orphan grace
+    period that have no row, or are editor assets of such an object, are
+    orphans: they are logged, and only deleted when ORPHAN_OBJECT_DELETE is on.
+    """
+    objects = list_prefix_objects(s3_client, prefix)
+    upload_keys = [key for key in objects if _editor_asset_owner_prefix(key) is None]
+    known_keys = set()
+    pending = []
+
+    for batch in _chunks(upload_keys, BATCH_SIZE):
+        rows = db.query(Video.id, Video.s3_key, Video.status).filter(
+            Video.s3_key.in_(batch)
+        ).all()
+        for video_id, s3_key, video_status in rows:
+            known_keys.add(s3_key)
+            if video_status in UNSETTLED_STATUSES:
+                pending.append((video_id, s3_key))
+
+    # Only rows still unsettled are moved on; ones confirm_upload completed in
+    # the meantime already have their editor assets queued
+    completed = []
+    for batch in _chunks(pending, BATCH_SIZE):
+        result = db.execute(
+            update(Video)
+            .where(
+                Video.id.in_([video_id for video_id, _ in batch]),
+                Video.status.in_(UNSETTLED_STATUSES)
+            )
+            .values(
+                status="COMPLETED",
+                editor_assets_status="PROCESSING",
+                editor_assets_version=Video.editor_assets_version + 1,
+                editor_assets_started_at=func.now()
+            )
+            .returning(Video.id, Video.s3_key, Video.editor_assets_version)
+        )
+        completed.extend(result.all())
+    db.commit()
+
+    for video_id, s3_key, version in completed:
+        queue_editor_assets(video_id, s3_key, version)
+
+    known_asset_prefixes = {editor_asset_prefix(key) for key in known_keys}
+    orphans = [
+        key for key, last_modified in objects.items()
+        if key not in known_keys
+        and _editor_asset_owner_prefix(key) not in known_asset_prefixes
+        and last_modified < orphan_cutoff
+    ]
+    if orphans and not settings.ORPHAN_OBJECT_DELETE:
+        logger.warning(
+            f"Found {len(orphans)} orphaned objects under {prefix} "
+            f"(ORPHAN_OBJECT_DELETE is off): {orphans[:20]}"
+        )
+        return {"completed": len(completed), "orphans_found": len(orphans), "orphans_deleted": 0}
+
+    deleted = delete_orphans(s3_client, prefix, orphans)
+    return {"completed": len(completed), "orphans_found": len(orphans), "orphans_deleted": deleted}
+
+
+def delete_orphans(s3_client, prefix: str, orphans: list) -> int:
+    """Delete orphaned objects and return how many were actually removed."""
+    deleted = 0
+    for batch in _chunks(orphans, DELETE_BATCH_SIZE):
+        response = s3_client.delete_objects(
+            Bucket=R2_BUCKET_NAME,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+        )
+        # Quiet mode only reports the keys that could not be deleted
+        failed = {error["Key"]: error.get("Code", "Unknown") for error in response.get("Errors", [])}
+        for key, code in failed.items():
+            logger.error(f"Failed to delete orphaned object {key}: {code}")
+
+        removed = [key for key in batch if key not in failed]
+        deleted += len(removed)
+        _forget_cached_urls(prefix, removed)
+    return deleted
+
+
+def _forget_cached_urls(prefix: str, keys: list) -> None:
+    """Drop shared cached download URLs that point at deleted uploads."""
+    user_id = prefix.rstrip("/")
+    if not user_id.isdigit():
+        return
+    for key in keys:
+        if _editor_asset_owner_prefix(key) is None:
+            download_url_cache.invalidate(int(user_id), key)
+
+
+def expire_stale_pending(db, pending_cutoff: datetime, skipped_prefixes: list) -> int:
+    """Mark PENDING rows created before the cutoff as EXPIRED.
+
+    Runs after the prefixes have been reconciled, so rows whose object had
+    been uploaded are already COMPLETED. Settings require PENDING_UPLOAD_TTL to
+    exceed PRESIGNED_URL_EXPIRATION, so the upload URLs of the remaining rows
+    can no longer be used to start an upload. One that was already running
+    may still finish later; the next sweep or `confirm_upload` then completes
+    the EXPIRED row. Rows under prefixes that failed to reconcile are skipped.
+    """
+    query = db.query(Video).filter(
+        Video.status == "PENDING",
+        Video.created_at < pending_cutoff
+    )
+    for prefix in skipped_prefixes:
+        query = query.filter(~Video.s3_key.startswith(prefix, autoescape=True))
+    expired = query.update({Video.status: "EXPIRED"}, synchronize_session=False)
+    db.commit()
+    return expired
+
+
+@celery_app.task
+def reconcile_uploads():
+    """Reconcile bucket contents with video records.
+
+    Lists the bucket one user prefix at a time instead of issuing a
+    `head_object` per video, completes uploads that were never confirmed,
+    reports or removes orphaned objects and expires abandoned PENDING rows.
+    A prefix that fails is logged and skipped so the others still run, and a
+    Redis lock keeps slow runs from overlapping.
+
+    Returns:
+        dict: Counts of completed, orphaned, deleted and expired items
+    """
+    lock = redis.Redis.from_url(settings.REDIS_URL).lock(
+        RECONCILE_LOCK_KEY, timeout=settings.UPLOAD_RECONCILE_LOCK_TTL
+    )
+    if not lock.acquire(blocking=False):
+        logger.info("Upload reconciliation already running, skipping this run")
+        return {"skipped": True}
+
+    try:
+        return _reconcile_all_prefixes()
+    finally:
+        try:
+            lock.release()
+        except redis.exceptions.LockError:
+            logger.warning("Upload reconciliation lock expired before the run finished")
+
+
+def _reconcile_all_prefixes() -> dict:
+    now = datetime.now(timezone.utc)
+    orphan_cutoff = now - timedelta(seconds=settings.ORPHAN_OBJECT_GRACE)
+    pending_cutoff = now - timedelta(seconds=settings.PENDING_UPLOAD_TTL)
+
+    s3_client = get_s3_client()
+    db = SessionLocal()
+    summary = {"completed": 0, "orphans_found": 0, "orphans_deleted": 0, "expired": 0, "failed_prefixes": []}
+    try:
+        for prefix in list_user_prefixes(s3_client):
+            try:
+                result = reconcile_prefix(db, s3_client, prefix, orphan_cutoff)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Upload reconciliation failed for prefix {prefix}: {str(e)}")
+                summary["failed_prefixes"].append(prefix)
+                continue
+            summary["completed"] += result["completed"]
+            summary["orphans_found"] += result["orphans_found"]
+            summary["orphans_deleted"] += result["orphans_deleted"]
+
+        summary["expired"] = expire_stale_pending(db, pending_cutoff, summary["failed_prefixes"])
+        logger.info(f"Upload reconciliation finished: {summary}")
+        return summary
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Upload reconciliation failed: {str(e)}")
+        raise e
+    finally:
+        db.close()
@@ -1,14 +1,39 @@
 import subprocess
 import uuid
 import os
+import sys
+import json
+import math
+import array
 import logging
+import tempfile
+from datetime import datetime, timezone
 from core.celery_app import celery_app
 from google import genai
 from core.config import settings
+from core.storage import EDITOR_ASSET_FILES, editor_asset_key, get_s3_client
+from db.session import SessionLocal
+from models.video import Video
 
 logger = logging.getLogger(__name__)
 api_key = settings.GEMINI_API_KEY
 
+# Editor proxy: small H.264 rendition that is cheap to scrub on mobile
+PROXY_HEIGHT = 360
+PROXY_VIDEO_BITRATE = "400k"
+PROXY_AUDIO_BITRATE = "64k"
+
+# Thumbnail sprite: one sheet of SPRITE_COLUMNS x SPRITE_ROWS tiles
+SPRITE_COLUMNS = 10
+SPRITE_ROWS = 10
+SPRITE_THUMB_WIDTH = 160
+SPRITE_THUMB_HEIGHT = 90
+SPRITE_MIN_INTERVAL = 1.0  # Seconds between thumbnails for short videos
+
+# Waveform: mono PCM at a low rate is plenty for drawing peaks
+WAVEFORM_SAMPLE_RATE = 8000
+WAVEFORM_PEAKS_PER_SECOND = 50
+
 @celery_app.task
 def burn_caption(get_presigned_url, subtitles):
     """Burn subtitles into a video file.
@@ -115,4 +140,230 @@ def extract_audio_and_transcribe(presigned_url):
                 os.remove(audio_output)
                 logger.info(f"Cleaned up temporary audio file: {audio_output}")
             except OSError as e:
-                logger.warning(f"Failed to delete temporary audio file {audio_output}: {e}")
\ No newline at end of file
+                logger.warning(f"Failed to delete temporary audio file {audio_output}: {e}")
+
+
+def probe_video(presigned_url):
+    """Return the duration in seconds and whether the video has an audio stream."""
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration:stream=codec_type",
+        "-of", "json",
+        presigned_url,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    info = json.loads(result.stdout)
+    duration = float(info.get("format", {}).get("duration") or 0)
+    has_audio = any(s.get("codec_type") == "audio" for s in info.get("streams", []))
+    return duration, has_audio
+
+
+def build_sprite_index(duration, interval):
+    """Describe where each thumbnail of the sprite sheet sits and when it applies."""
+    max_frames = SPRITE_COLUMNS * SPRITE_ROWS
+    count = min(max_frames, max(1, math.ceil(duration / interval)))
+    frames = []
+    for i in range(count):
+        frames.append({
+            "start": round(i * interval, 3),
+            "end": round(min((i + 1) * interval, duration), 3),
+            "x": (i % SPRITE_COLUMNS) * SPRITE_THUMB_WIDTH,
+            "y": (i // SPRITE_COLUMNS) * SPRITE_THUMB_HEIGHT,
+        })
+    return {
+        "sprite": EDITOR_ASSET_FILES["sprite"],
+        "duration": duration,
+        "interval": interval,
+        "columns": SPRITE_COLUMNS,
+        "rows": SPRITE_ROWS,
+        "width": SPRITE_THUMB_WIDTH,
+        "height": SPRITE_THUMB_HEIGHT,
+        "frames": frames,
+    }
+
+
+def compute_waveform_peaks(pcm_path):
+    """Reduce signed 16-bit mono PCM to normalised peak values.
+    
+    Pass None for videos without audio to get an empty waveform.
+    """
+    samples_per_peak = WAVEFORM_SAMPLE_RATE // WAVEFORM_PEAKS_PER_SECOND
+    chunk_size = samples_per_peak * 2
+    peaks = []
+    if pcm_path:
+        with open(pcm_path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if len(chunk) < 2:
+                    break
+                samples = array.array("h", chunk[:len(chunk) - len(chunk) % 2])
+                if sys.byteorder == "big":
+                    samples.byteswap()
+                peak = max(max(samples), -min(samples))
+                peaks.append(round(min(peak / 32768, 1.0), 3))
+    return {
+        "sample_rate": WAVEFORM_SAMPLE_RATE,
+        "samples_per_peak": samples_per_peak,
+        "peaks_per_second": WAVEFORM_PEAKS_PER_SECOND,
+        "peaks": peaks,
+    }
+
+
+def parse_progress_duration(progress_output):
+    """Return the decoded duration in seconds from FFmpeg `-progress` output.
+    
+    Returns 0.0 when FFmpeg reported no usable timestamp.
+    """
+    duration_us = 0
+    for line in progress_output.splitlines():
+        name, _, value = line.partition("=")
+        if name.strip() == "out_time_us" and value.strip().lstrip("-").isdigit():
+            duration_us = max(duration_us, int(value))
+    return duration_us / 1_000_000
+
+
+def set_editor_assets_status(video_id, version, editor_status, extra_values=None):
+    """Update the editor asset status if `version` is still the current run.
+    
+    Runs that were superseded by a requeue leave the row alone, so an old run
+    finishing late cannot overwrite the outcome of a newer one.
+    
+    Returns:
+        bool: Whether the row was updated
+    """
+    db = SessionLocal()
+    try:
+        values = {Video.editor_assets_status: editor_status}
+        values.update(extra_values or {})
+        updated = db.query(Video).filter(
+            Video.id == video_id,
+            Video.editor_assets_version == version
+        ).update(values, synchronize_session=False)
+        db.commit()
+        return bool(updated)
+    finally:
+        db.close()
+
+
+# The hard time limit matches the staleness timeout, so a run that is old
+# enough to be requeued has already been stopped
+@celery_app.task(time_limit=settings.EDITOR_ASSETS_STALE_AFTER)
+def generate_editor_assets(video_id, s3_key, version):
+    """Generate the subtitle editor assets for an uploaded video.
+    
+    A single FFmpeg run decodes the original once and writes a low-bitrate
+    proxy, a thumbnail sprite sheet and mono PCM for the waveform. The results
+    are uploaded next to the original `s3_key`.
+    
+    Args:
+        video_id: ID of the video record
+        s3_key: The S3 key of the original video file
+        version: `editor_assets_version` this run was queued for
+        
+    Returns:
+        dict: Storage keys of the generated assets, or None if the run was
+        superseded before it started
+    """
+    # Restart the staleness clock now that the run is actually executing
+    if not set_editor_assets_status(
+        video_id, version, "PROCESSING",
+        {Video.editor_assets_started_at: datetime.now(timezone.utc)}
+    ):
+        logger.info(f"Skipping superseded editor assets run {version} for video {video_id}")
+        return None
+
+    try:
+        s3_client = get_s3_client()
+        presigned_url = s3_client.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': settings.R2_BUCKET_NAME,
+                'Key': s3_key
+            },
+            ExpiresIn=settings.PRESIGNED_URL_EXPIRATION
+        )
+
+        # The probed duration only picks the thumbnail interval; WebM and MKV
+        # often carry none, in which case short intervals are used
+        probed_duration, has_audio = probe_video(presigned_url)
+        interval = max(SPRITE_MIN_INTERVAL, probed_duration / (SPRITE_COLUMNS * SPRITE_ROWS))
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            proxy_path = os.path.join(work_dir, EDITOR_ASSET_FILES["proxy"])
+            sprite_path = os.path.join(work_dir, EDITOR_ASSET_FILES["sprite"])
+            pcm_path = os.path.join(work_dir, "waveform.pcm")
+
+            sprite_filter = (
+                f"fps=1/{interval},"
+                f"scale={SPRITE_THUMB_WIDTH}:{SPRITE_THUMB_HEIGHT}:force_original_aspect_ratio=decrease,"
+                f"pad={SPRITE_THUMB_WIDTH}:{SPRITE_THUMB_HEIGHT}:(ow-iw)/2:(oh-ih)/2,"
+                f"tile={SPRITE_COLUMNS}x{SPRITE_ROWS}"
+            )
+
+            # One input, three outputs: the original is only downloaded and decoded once
+            cmd = ["ffmpeg", "-y", "-nostats", "-progress", "pipe:1", "-i", presigned_url]
+            cmd += ["-map", "0:v:0", "-vf", f"scale=-2:{PROXY_HEIGHT}",
+                    "-c:v", "libx264", "-preset", "veryfast",
+                    "-b:v", PROXY_VIDEO_BITRATE, "-maxrate", PROXY_VIDEO_BITRATE, "-bufsize", "800k"]
+            if has_audio:
+                cmd += ["-map", "0:a:0", "-c:a", "aac", "-b:a", PROXY_AUDIO_BITRATE, "-ac", "1"]
+            cmd += ["-movflags", "+faststart", proxy_path]
+            cmd += ["-map", "0:v:0", "-vf", sprite_filter, "-frames:v", "1", "-q:v", "5", sprite_path]
+            if has_audio:
+                cmd += ["-map", "0:a:0", "-ac", "1", "-ar", str(WAVEFORM_SAMPLE_RATE),
+                        "-c:a", "pcm_s16le", "-f", "s16le", pcm_path]
+
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+
+            # Index what was actually decoded so it matches the tiles in the sprite
+            duration = parse_progress_duration(result.stdout) or probed_duration
+            sprite_index = build_sprite_index(duration, interval)
+            waveform = compute_waveform_peaks(pcm_path if has_audio else None)
+
+            for asset, path, content_type in (
+                ("proxy", proxy_path, "video/mp4"),
+                ("sprite", sprite_path, "image/jpeg"),
+            ):
+                s3_client.upload_file(
+                    path, settings.R2_BUCKET_NAME, editor_asset_key(s3_key, asset),
+                    ExtraArgs={"ContentType": content_type}
+                )
+            for asset, body in (("sprite_index", sprite_index), ("waveform", waveform)):
+                s3_client.put_object(
+                    Bucket=settings.R2_BUCKET_NAME,
+                    Key=editor_asset_key(s3_key, asset),
+                    Body=json.dumps(body, separators=(",", ":")),
+                    ContentType="application/json"
+                )
+
+        set_editor_assets_status(video_id, version, "READY")
+        logger.info(f"Editor assets generated for video {video_id}")
+        return {asset: editor_asset_key(s3_key, asset) for asset in EDITOR_ASSET_FILES}
+
+    except subprocess.CalledProcessError as e:
+        logger.error(f"FFmpeg error generating editor assets for video {video_id}: {e.stderr or e.stdout or 'Unknown error'}")
+        set_editor_assets_status(video_id, version, "FAILED")
+        raise e
+    except Exception as e:
+        logger.error(f"Error generating editor assets for video {video_id}: {str(e)}")
+        set_editor_assets_status(video_id, version, "FAILED")
+        raise e
+
+
+def queue_editor_assets(video_id, s3_key, version):
+    """Queue `generate_editor_assets` for a video already marked PROCESSING.
+    
+    If the broker cannot take the task, the video is marked FAILED so it can
+    be requeued later instead of staying PROCESSING forever.
+    
+    Returns:
+        bool: Whether the task was queued
+    """
+    try:
+        generate_editor_assets.delay(video_id, s3_key, version)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to queue editor assets for video {video_id}: {str(e)}")
+        set_editor_assets_status(video_id, version, "FAILED")
+        return False
@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+
+# Settings are read at import time, so provide placeholders for the tests
+os.environ.setdefault("APP_NAME", "Burner")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'burner-test.db')}")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("REFRESH_KEY", "test-refresh")
+os.environ.setdefault("R2_ACCOUNT_ID", "test-account")
+os.environ.setdefault("R2_ACCESS_KEY", "test-access")
+os.environ.setdefault("R2_SECRET_KEY", "test-secret")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("GEMINI_API_KEY", "test-gemini")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture
+def db():
+    """In-memory database session with all tables created."""
+    from db.base import Base
+    import models.user  # noqa: F401  registers the users table for the FK
+    import models.video  # noqa: F401
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models.video import Video
+from tasks import storage_tasks
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+OLD = NOW - timedelta(days=2)
+ORPHAN_CUTOFF = NOW - timedelta(days=1)
+
+
+class FakePaginator:
+    def __init__(self, objects):
+        self.objects = objects
+
+    def paginate(self, Bucket, Prefix):
+        yield {"Contents": [
+            {"Key": key, "LastModified": modified}
+            for key, modified in self.objects.items() if key.startswith(Prefix)
+        ]}
+
+
+class FakeS3:
+    def __init__(self, objects, failing_keys=()):
+        self.objects = dict(objects)
+        self.failing_keys = set(failing_keys)
+        self.delete_calls = 0
+
+    def get_paginator(self, name):
+        return FakePaginator(self.objects)
+
+    def delete_objects(self, Bucket, Delete):
+        self.delete_calls += 1
+        errors = []
+        for obj in Delete["Objects"]:
+            if obj["Key"] in self.failing_keys:
+                errors.append({"Key": obj["Key"], "Code": "AccessDenied"})
+            else:
+                self.objects.pop(obj["Key"], None)
+        return {"Errors": errors} if errors else {}
+
+
+@pytest.fixture(autouse=True)
+def no_task_queue(monkeypatch):
+    queued = []
+    monkeypatch.setattr(storage_tasks, "queue_editor_assets", lambda *args: queued.append(args) or True)
+    return queued
+
+
+def add_video(db, s3_key, status):
+    video = Video(user_id=1, s3_key=s3_key, bucket="b", original_name="v.mp4", status=status)
+    db.add(video)
+    db.commit()
+    return video
+
+
+def test_uploaded_pending_and_expired_rows_are_completed(db, no_task_queue):
+    pending = add_video(db, "1/a.mp4", "PENDING")
+    expired = add_video(db, "1/b.mp4", "EXPIRED")
+    missing = add_video(db, "1/c.mp4", "PENDING")
+    s3 = FakeS3({"1/a.mp4": NOW, "1/b.mp4": NOW})
+
+    result = storage_tasks.reconcile_prefix(db, s3, "1/", ORPHAN_CUTOFF)
+
+    db.expire_all()
+    assert result["completed"] == 2
+    assert pending.status == "COMPLETED"
+    assert expired.status == "COMPLETED"
+    assert missing.status == "PENDING"
+    assert sorted(no_task_queue) == [(pending.id, "1/a.mp4", 1), (expired.id, "1/b.mp4", 1)]
+
+
+def test_orphans_are_only_reported_by_default(db, monkeypatch):
+    monkeypatch.setattr(storage_tasks.settings, "ORPHAN_OBJECT_DELETE", False)
+    s3 = FakeS3({"1/orphan.mp4": OLD})
+
+    result = storage_tasks.reconcile_prefix(db, s3, "1/", ORPHAN_CUTOFF)
+
+    assert result["orphans_found"] == 1
+    assert result["orphans_deleted"] == 0
+    assert s3.delete_calls == 0
+    assert "1/orphan.mp4" in s3.objects
+
+
+def test_orphan_deletion_counts_only_removed_keys(db, monkeypatch):
+    monkeypatch.setattr(storage_tasks.settings, "ORPHAN_OBJECT_DELETE", True)
+    add_video(db, "1/kept.mp4", "COMPLETED")
+    s3 = FakeS3(
+        {
+            "1/kept.mp4": OLD,
+            "1/kept/editor/proxy.mp4": OLD,
+            "1/recent.mp4": NOW,
+            "1/gone.mp4": OLD,
+            "1/gone/editor/proxy.mp4": OLD,
+            "1/locked.mp4": OLD,
+        },
+        failing_keys={"1/locked.mp4"},
+    )
+
+    result = storage_tasks.reconcile_prefix(db, s3, "1/", ORPHAN_CUTOFF)
+
+    assert result["orphans_found"] == 3
+    assert result["orphans_deleted"] == 2
+    assert set(s3.objects) == {"1/kept.mp4", "1/kept/editor/proxy.mp4", "1/recent.mp4", "1/locked.mp4"}
+
+
+def test_expiry_skips_prefixes_that_failed(db):
+    add_video(db, "1/a.mp4", "PENDING")
+    add_video(db, "2/b.mp4", "PENDING")
+
+    expired = storage_tasks.expire_stale_pending(db, datetime.now(timezone.utc) + timedelta(seconds=1), ["1/"])
+
+    statuses = dict(db.query(Video.s3_key, Video.status).all())
+    assert expired == 1
+    assert statuses == {"1/a.mp4": "PENDING", "2/b.mp4": "EXPIRED"}
@@ -0,0 +1,103 @@
+import pytest
+
+from core import url_cache
+from core.url_cache import PresignedUrlCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(url_cache.time, "time", fake.time)
+    return fake
+
+
+def test_url_is_reused_until_remaining_lifetime_drops_to_ratio(clock):
+    cache = PresignedUrlCache(max_size=10, lifetime=100, min_remaining_ratio=0.5)
+    cache.set(1, "1/a.mp4", "url-a")
+
+    clock.now += 49
+    assert cache.get(1, "1/a.mp4") == "url-a"
+
+    clock.now += 1
+    assert cache.get(1, "1/a.mp4") is None
+
+
+def test_entries_are_scoped_to_user(clock):
+    cache = PresignedUrlCache(max_size=10, lifetime=100, min_remaining_ratio=0.5)
+    cache.set(1, "1/a.mp4", "url-a")
+
+    assert cache.get(2, "1/a.mp4") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = PresignedUrlCache(max_size=2, lifetime=100, min_remaining_ratio=0.5)
+    cache.set(1, "a", "url-a")
+    cache.set(1, "b", "url-b")
+    assert cache.get(1, "a") == "url-a"
+
+    cache.set(1, "c", "url-c")
+
+    assert cache.get(1, "b") is None
+    assert cache.get(1, "a") == "url-a"
+    assert cache.get(1, "c") == "url-c"
+
+
+def test_invalidate_removes_local_and_redis_entries(clock):
+    cache = PresignedUrlCache(max_size=10, lifetime=100, min_remaining_ratio=0.5)
+    cache._redis = FakeRedis()
+    cache.set(1, "a", "url-a")
+
+    cache.invalidate(1, "a")
+
+    assert cache.get(1, "a") is None
+    assert cache._redis.store == {}
+
+
+def test_redis_entry_is_shared_between_caches(clock):
+    shared = FakeRedis()
+    writer = PresignedUrlCache(max_size=10, lifetime=100, min_remaining_ratio=0.5)
+    reader = PresignedUrlCache(max_size=10, lifetime=100, min_remaining_ratio=0.5)
+    writer._redis = shared
+    reader._redis = shared
+
+    writer.set(1, "a", "url-a")
+
+    assert reader.get(1, "a") == "url-a"
+
+
+def test_malformed_redis_entry_is_a_miss(clock):
+    cache = PresignedUrlCache(max_size=10, lifetime=100, min_remaining_ratio=0.5)
+    cache._redis = FakeRedis()
+    cache._redis.store[cache._redis_key(1, "a")] = b"not json"
+    cache._redis.store[cache._redis_key(1, "b")] = b'{"url": "url-b"}'
+
+    assert cache.get(1, "a") is None
+    assert cache.get(1, "b") is None
+
+
+@pytest.mark.parametrize("ratio", [-0.1, 1, 1.5])
+def test_ratio_outside_range_is_rejected(ratio):
+    with pytest.raises(ValueError):
+        PresignedUrlCache(max_size=10, lifetime=100, min_remaining_ratio=ratio)
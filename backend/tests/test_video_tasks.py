@@ -0,0 +1,92 @@
+import array
+import sys
+
+import pytest
+
+from tasks.video_tasks import (
+    SPRITE_COLUMNS,
+    SPRITE_MIN_INTERVAL,
+    SPRITE_ROWS,
+    SPRITE_THUMB_HEIGHT,
+    SPRITE_THUMB_WIDTH,
+    WAVEFORM_PEAKS_PER_SECOND,
+    WAVEFORM_SAMPLE_RATE,
+    build_sprite_index,
+    compute_waveform_peaks,
+    parse_progress_duration,
+)
+
+SAMPLES_PER_PEAK = WAVEFORM_SAMPLE_RATE // WAVEFORM_PEAKS_PER_SECOND
+
+
+def write_pcm(path, samples):
+    data = array.array("h", samples)
+    if sys.byteorder == "big":
+        data.byteswap()
+    path.write_bytes(data.tobytes())
+
+
+def test_short_video_gets_one_thumbnail_per_interval():
+    index = build_sprite_index(4.5, SPRITE_MIN_INTERVAL)
+
+    assert [(f["start"], f["end"]) for f in index["frames"]] == [
+        (0.0, 1.0), (1.0, 2.0), (2.0, 3.0), (3.0, 4.0), (4.0, 4.5)
+    ]
+    assert [(f["x"], f["y"]) for f in index["frames"]] == [
+        (0, 0), (160, 0), (320, 0), (480, 0), (640, 0)
+    ]
+
+
+def test_long_video_fills_the_whole_sheet():
+    duration = 1000.0
+    index = build_sprite_index(duration, duration / (SPRITE_COLUMNS * SPRITE_ROWS))
+
+    frames = index["frames"]
+    assert len(frames) == SPRITE_COLUMNS * SPRITE_ROWS
+    assert frames[SPRITE_COLUMNS]["x"] == 0
+    assert frames[SPRITE_COLUMNS]["y"] == SPRITE_THUMB_HEIGHT
+    assert frames[-1] == {
+        "start": 990.0,
+        "end": 1000.0,
+        "x": (SPRITE_COLUMNS - 1) * SPRITE_THUMB_WIDTH,
+        "y": (SPRITE_ROWS - 1) * SPRITE_THUMB_HEIGHT,
+    }
+
+
+def test_frames_are_capped_when_decoded_duration_exceeds_the_sheet():
+    index = build_sprite_index(500.0, SPRITE_MIN_INTERVAL)
+
+    assert len(index["frames"]) == SPRITE_COLUMNS * SPRITE_ROWS
+    assert index["frames"][-1]["start"] == 99.0
+
+
+def test_zero_duration_describes_a_single_frame():
+    index = build_sprite_index(0.0, SPRITE_MIN_INTERVAL)
+
+    assert index["frames"] == [{"start": 0.0, "end": 0.0, "x": 0, "y": 0}]
+
+
+def test_peaks_are_normalised_per_window(tmp_path):
+    pcm = tmp_path / "waveform.pcm"
+    quiet = [0, 8192, -4096] + [0] * (SAMPLES_PER_PEAK - 3)
+    loud = [0, -32768] + [0] * (SAMPLES_PER_PEAK - 2)
+    partial = [16384, -100]
+    write_pcm(pcm, quiet + loud + partial)
+
+    waveform = compute_waveform_peaks(str(pcm))
+
+    assert waveform["samples_per_peak"] == SAMPLES_PER_PEAK
+    assert waveform["peaks"] == [0.25, 1.0, 0.5]
+
+
+def test_video_without_audio_has_no_peaks():
+    assert compute_waveform_peaks(None)["peaks"] == []
+
+
+@pytest.mark.parametrize("output, expected", [
+    ("frame=10\nout_time_us=1500000\nprogress=continue\nout_time_us=12345678\nprogress=end\n", 12.345678),
+    ("out_time_us=N/A\nprogress=end\n", 0.0),
+    ("", 0.0),
+])
+def test_decoded_duration_is_read_from_progress(output, expected):
+    assert parse_progress_duration(output) == pytest.approx(expected)
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from controller import video_upload_controller
+from models.user import User
+from models.video import Video
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(video_upload_controller, "queue_editor_assets", lambda *args: calls.append(args) or True)
+    return calls
+
+
+@pytest.fixture
+def user(db):
+    user = User(name="Ada", email="ada@example.com", password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def add_video(db, user, editor_status, started_ago=None):
+    started_at = None
+    if started_ago is not None:
+        started_at = datetime.now(timezone.utc) - started_ago
+    video = Video(
+        user_id=user.id, s3_key=f"{user.id}/a.mp4", bucket="b", original_name="a.mp4",
+        status="COMPLETED", editor_assets_status=editor_status,
+        editor_assets_version=3, editor_assets_started_at=started_at
+    )
+    db.add(video)
+    db.commit()
+    return video
+
+
+@pytest.mark.parametrize("editor_status, started_ago", [
+    (None, None),
+    ("FAILED", timedelta(minutes=1)),
+    ("PROCESSING", timedelta(days=1)),
+])
+def test_failed_missing_or_stale_assets_are_requeued(db, user, queued, editor_status, started_ago):
+    video = add_video(db, user, editor_status, started_ago)
+
+    result = video_upload_controller.regenerate_editor_assets(db, video.id, user)
+
+    assert result == {"video_id": video.id, "status": "PROCESSING"}
+    assert queued == [(video.id, video.s3_key, 4)]
+
+
+@pytest.mark.parametrize("editor_status, started_ago", [
+    ("READY", timedelta(days=1)),
+    ("PROCESSING", timedelta(minutes=1)),
+])
+def test_ready_or_running_assets_are_not_requeued(db, user, queued, editor_status, started_ago):
+    video = add_video(db, user, editor_status, started_ago)
+
+    with pytest.raises(HTTPException) as exc:
+        video_upload_controller.regenerate_editor_assets(db, video.id, user)
+
+    assert exc.value.status_code == 409
+    assert queued == []
+    db.refresh(video)
+    assert video.editor_assets_version == 3